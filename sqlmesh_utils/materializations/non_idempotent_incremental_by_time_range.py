@@ -7,15 +7,32 @@ from sqlglot import exp
 from sqlmesh.utils.date import make_inclusive
 from sqlmesh.utils.errors import ConfigError, SQLMeshError
 from pydantic import model_validator
-from sqlmesh.utils.pydantic import list_of_fields_validator, bool_validator
+from sqlmesh.utils.pydantic import list_of_fields_validator, bool_validator, positive_int_validator
 from sqlmesh.utils.date import TimeLike
 from sqlmesh.core.engine_adapter.base import MERGE_SOURCE_ALIAS, MERGE_TARGET_ALIAS
 from sqlmesh import CustomKind
 from sqlmesh.utils import columns_to_types_all_known
+from sqlmesh.utils.concurrency import concurrent_apply_to_values
+from sqlmesh.utils.connection_pool import SingletonConnectionPool
 
 if t.TYPE_CHECKING:
     from sqlmesh.core.engine_adapter._typing import QueryOrDF
 
+# functions that produce a BIGINT hash of a VARCHAR expression, per engine dialect
+_HASH_FUNCTIONS: t.Dict[str, t.Callable[[exp.Expression], exp.Expression]] = {
+    "trino": lambda e: exp.func(
+        "from_big_endian_64",
+        exp.func("xxhash64", exp.func("to_utf8", e, dialect="trino")),
+    ),
+    "postgres": lambda e: exp.func("hashtextextended", e, exp.Literal.number(0)),
+}
+
+
+def _inject_alias(node: exp.Expression, alias: str) -> exp.Expression:
+    if isinstance(node, exp.Column):
+        node.set("table", exp.to_identifier(alias, quoted=True))
+    return node
+
 
 class NonIdempotentIncrementalByTimeRangeKind(CustomKind):
     _time_column: TimeColumn
@@ -24,6 +41,11 @@ class NonIdempotentIncrementalByTimeRangeKind(CustomKind):
 
     _partition_by_time_column: bool
 
+    _merge_buckets: int
+    _merge_bucket_concurrency: int
+
+    _propagate_deletes: bool
+
     @model_validator(mode="after")
     def _validate_model(self):
         self._time_column = TimeColumn.create(
@@ -50,8 +72,21 @@ class NonIdempotentIncrementalByTimeRangeKind(CustomKind):
             self.materialization_properties.get("partition_by_time_column", True)
         )
 
+        self._merge_buckets = self._positive_int_property("merge_buckets")
+        self._merge_bucket_concurrency = self._positive_int_property("merge_bucket_concurrency")
+
+        self._propagate_deletes = bool_validator(
+            self.materialization_properties.get("propagate_deletes", False)
+        )
+
         return self
 
+    def _positive_int_property(self, name: str) -> int:
+        try:
+            return positive_int_validator(self.materialization_properties.get(name, 1))
+        except ValueError as e:
+            raise ConfigError(f"`{name}` must be a positive integer") from e
+
     @property
     def time_column(self) -> TimeColumn:
         return self._time_column
@@ -64,6 +99,18 @@ class NonIdempotentIncrementalByTimeRangeKind(CustomKind):
     def partition_by_time_column(self) -> bool:
         return self._partition_by_time_column
 
+    @property
+    def merge_buckets(self) -> int:
+        return self._merge_buckets
+
+    @property
+    def merge_bucket_concurrency(self) -> int:
+        return self._merge_bucket_concurrency
+
+    @property
+    def propagate_deletes(self) -> bool:
+        return self._propagate_deletes
+
 
 class NonIdempotentIncrementalByTimeRangeMaterialization(
     CustomMaterialization[NonIdempotentIncrementalByTimeRangeKind]
@@ -85,6 +132,25 @@ class NonIdempotentIncrementalByTimeRangeMaterialization(
         assert isinstance(model.kind, NonIdempotentIncrementalByTimeRangeKind)
         assert model.time_column
 
+        # fail before anything has been written to the database
+        if model.kind.merge_buckets > 1:
+            if self.adapter.dialect not in _HASH_FUNCTIONS:
+                raise SQLMeshError(
+                    f"`merge_buckets` is not supported on the '{self.adapter.dialect}' engine"
+                )
+
+            # the evaluator calls insert() inside a transaction on the calling thread's connection, so worker
+            # threads on other connections can't see the staged table and would commit outside of it. With a
+            # single connection, the workers would share one cursor which isn't thread safe
+            if model.kind.merge_bucket_concurrency > 1 and (
+                self.adapter.SUPPORTS_TRANSACTIONS
+                or isinstance(self.adapter._connection_pool, SingletonConnectionPool)
+            ):
+                raise SQLMeshError(
+                    "`merge_bucket_concurrency` is only supported on engines without transactions "
+                    "and requires the connection to be configured with `concurrent_tasks` > 1"
+                )
+
         start: TimeLike = kwargs["start"]
         end: TimeLike = kwargs["end"]
 
@@ -97,11 +163,6 @@ class NonIdempotentIncrementalByTimeRangeMaterialization(
             for dt in make_inclusive(start, end, self.adapter.dialect)
         ]
 
-        def _inject_alias(node: exp.Expression, alias: str) -> exp.Expression:
-            if isinstance(node, exp.Column):
-                node.set("table", exp.to_identifier(alias, quoted=True))
-            return node
-
         # note: this is a leak guard on the source side that also serves as a merge_filter
         # on the target side to help prevent a full table scan when loading intervals
         betweens = [
@@ -113,13 +174,128 @@ class NonIdempotentIncrementalByTimeRangeMaterialization(
             for alias in [MERGE_SOURCE_ALIAS, MERGE_TARGET_ALIAS]
         ]
 
-        self.adapter.merge(
-            target_table=table_name,
-            source_table=query_or_df,
-            columns_to_types=columns_to_types,
-            unique_key=model.kind.primary_key,
-            merge_filter=exp.and_(*betweens),
+        if model.kind.merge_buckets == 1 and not model.kind.propagate_deletes:
+            self.adapter.merge(
+                target_table=table_name,
+                source_table=query_or_df,
+                columns_to_types=columns_to_types,
+                unique_key=model.kind.primary_key,
+                merge_filter=exp.and_(*betweens),
+            )
+            return
+
+        unique_key = model.kind.primary_key
+        merge_buckets = model.kind.merge_buckets
+        propagate_deletes = model.kind.propagate_deletes
+
+        # DELETE statements can't alias the target table, so qualify its columns by name instead
+        target_name = exp.to_table(table_name).name
+        target_between = exp.Between(
+            this=model.time_column.column.transform(lambda n: _inject_alias(n, target_name)),
+            low=low,
+            high=high,
+        )
+
+        # stage the source once so that each statement reads from it instead of re-evaluating the query
+        with self.adapter.temp_table(
+            query_or_df, name=table_name, columns_to_types=columns_to_types
+        ) as staged_table:
+
+            def _merge_bucket(bucket: int) -> None:
+                source_query = exp.select(
+                    *(exp.column(col, quoted=True) for col in columns_to_types)
+                ).from_(staged_table)
+                merge_filters: t.List[exp.Expression] = [*betweens]
+
+                if merge_buckets > 1:
+                    # the source side has to be filtered in a WHERE because rows excluded by the ON clause
+                    # would be treated as WHEN NOT MATCHED and inserted. On the target side, the bucket
+                    # predicate is redundant with the key join but lets the engine prune before joining
+                    source_query = source_query.where(self._bucket_predicate(model, bucket))
+                    merge_filters.append(
+                        self._bucket_predicate(model, bucket, alias=MERGE_TARGET_ALIAS)
+                    )
+
+                if propagate_deletes:
+                    # delete target records in the interval whose key is no longer present in the source.
+                    # This runs before the merge so that target records with NULL key parts, which can
+                    # never match, get replaced rather than duplicated
+                    staged_keys = (
+                        exp.select("1")
+                        .from_(staged_table.as_(MERGE_SOURCE_ALIAS))
+                        .where(
+                            # consider the same source rows as the MERGE so that keys outside the
+                            # interval don't prevent target records inside it from being deleted
+                            betweens[0],
+                            *(
+                                part.transform(lambda n: _inject_alias(n, MERGE_SOURCE_ALIAS)).eq(
+                                    part.transform(lambda n: _inject_alias(n, target_name))
+                                )
+                                for part in unique_key
+                            ),
+                        )
+                    )
+                    delete_filters: t.List[exp.Expression] = [
+                        target_between,
+                        exp.not_(exp.Exists(this=staged_keys)),
+                    ]
+                    if merge_buckets > 1:
+                        delete_filters.append(
+                            self._bucket_predicate(model, bucket, alias=target_name)
+                        )
+                    self.adapter.delete_from(table_name, where=exp.and_(*delete_filters))
+
+                self.adapter.merge(
+                    target_table=table_name,
+                    source_table=source_query,
+                    columns_to_types=columns_to_types,
+                    unique_key=unique_key,
+                    merge_filter=exp.and_(*merge_filters),
+                )
+
+            # concurrency is only validated when bucketing, so never hand a single statement off to a
+            # worker thread where it would run outside of the evaluator's transaction
+            concurrent_apply_to_values(
+                list(range(merge_buckets)),
+                _merge_bucket,
+                model.kind.merge_bucket_concurrency if merge_buckets > 1 else 1,
+            )
+
+    def _bucket_predicate(
+        self, model: Model, bucket: int, alias: t.Optional[str] = None
+    ) -> exp.Expression:
+        """
+        Builds `hash(primary_key) mod merge_buckets = bucket`, with the primary key columns optionally
+        qualified by `alias`
+        """
+        assert isinstance(model.kind, NonIdempotentIncrementalByTimeRangeKind)
+
+        hash_function = _HASH_FUNCTIONS[self.adapter.dialect]
+
+        # concat_ws skips NULLs, so the key is never NULL and every source row lands in exactly one bucket
+        key = exp.ConcatWs(
+            expressions=[
+                exp.Literal.string("|"),
+                *(
+                    expr.transform(lambda n: _inject_alias(n, alias)) if alias else expr
+                    for expr in model.kind.primary_key
+                ),
+            ]
+        )
+
+        # mod can be negative for negative hashes, so shift it into [0, merge_buckets)
+        num_buckets = exp.Literal.number(model.kind.merge_buckets)
+        bucket_expr = exp.Mod(
+            this=exp.paren(
+                exp.Add(
+                    this=exp.Mod(this=hash_function(key), expression=num_buckets),
+                    expression=num_buckets,
+                ),
+                copy=False,
+            ),
+            expression=num_buckets,
         )
+        return bucket_expr.eq(exp.Literal.number(bucket))
 
     def append(
         self,
@@ -232,3 +232,221 @@ def test_partial_restatement(project: Project):
     )
 
     assert not any(["CHANGED" in r[2] for r in remaining_records])
+
+
+def test_merge_buckets(project: Project):
+    # upstream data to consume
+    upstream_table_name = f"{project.test_schema}.event_data"
+
+    upstream_data = [
+        (1, "web", "cglading0@icq.com", to_datetime("2024-01-01 08:57:02")),
+        (2, "web", "dwalczynski1@reuters.com", to_datetime("2024-01-01 22:47:38")),
+        (3, "web", "sleggin2@va.gov", to_datetime("2024-01-01 22:28:34")),
+        (1, "mobile", "atrowsdale3@sun.com", to_datetime("2024-01-01 03:55:21")),
+        (1, "api", "opursey4@drupal.org", to_datetime("2024-01-01 04:39:03")),
+        (6, "api", "bcutcliffe5@wisc.edu", to_datetime("2024-01-02 18:26:50")),
+        (7, "mobile", "scressar6@newsvine.com", to_datetime("2024-01-02 22:06:05")),
+        (None, "web", "skaradzas7@is.gd", to_datetime("2024-01-02 09:06:01")),
+    ]
+
+    upstream_table_columns = {
+        "event_id": exp.DataType.build("int"),
+        "event_source": exp.DataType.build("varchar"),
+        "data": exp.DataType.build("varchar"),
+        "event_timestamp": exp.DataType.build("timestamp"),
+    }
+
+    project.engine_adapter.create_table(
+        upstream_table_name, columns_to_types=upstream_table_columns
+    )
+    project.engine_adapter.insert_append(
+        upstream_table_name,
+        query_or_df=next(
+            d.select_from_values(upstream_data, columns_to_types=upstream_table_columns)
+        ),
+    )
+
+    # downstream model using custom materialization
+    project.write_model(
+        "test_table.sql",
+        definition=f"""
+        MODEL (
+            name {project.test_schema}.model,
+            kind CUSTOM (
+                materialization 'non_idempotent_incremental_by_time_range',
+                materialization_properties (
+                    time_column = event_timestamp,
+                    primary_key = (event_id, event_source),
+                    merge_buckets = 3
+                ),
+                batch_size 1,
+                batch_concurrency 1
+            ),
+            start '2024-01-01',
+            end '2024-01-02'
+        );
+
+        SELECT event_id, event_source, data, event_timestamp
+        FROM {upstream_table_name} WHERE event_timestamp BETWEEN @start_dt AND @end_dt;
+    """,
+    )
+
+    ctx = project.context
+    assert len(ctx.models) > 0
+    ctx.plan(auto_apply=True, no_prompts=True)
+
+    # every record should land in exactly one bucket, including the one with a NULL key part
+    records = [
+        tuple(r)
+        for r in project.engine_adapter.fetchall(
+            f"select event_id, event_source, data from {project.test_schema}.model order by event_timestamp"
+        )
+    ]
+    assert records == [(r[0], r[1], r[2]) for r in sorted(upstream_data, key=lambda r: r[3])]
+
+    # change upstream data so that the restatement has to match existing records in every bucket
+    changed_upstream_data = [
+        (r[0], r[1], f"CHANGED_{r[2]}", r[3]) if to_ds(r[3]) == "2024-01-01" else r
+        for r in upstream_data
+    ]
+    project.engine_adapter.drop_table(upstream_table_name)
+    project.engine_adapter.create_table(
+        upstream_table_name, columns_to_types=upstream_table_columns
+    )
+    project.engine_adapter.insert_append(
+        upstream_table_name,
+        query_or_df=next(
+            d.select_from_values(changed_upstream_data, columns_to_types=upstream_table_columns)
+        ),
+    )
+
+    # restate model. This excludes 2024-01-02 because the record with a NULL key part can never
+    # be matched by a MERGE and would be inserted again
+    ctx.plan(
+        restate_models=[f"{project.test_schema}.model"],
+        start=to_datetime("2024-01-01 00:00:00"),
+        end=to_datetime("2024-01-02 00:00:00"),
+        auto_apply=True,
+    )
+
+    # the restated records should be updated in place without introducing duplicates
+    records = [
+        tuple(r)
+        for r in project.engine_adapter.fetchall(
+            f"select event_id, event_source, data from {project.test_schema}.model order by event_timestamp"
+        )
+    ]
+    assert records == [
+        (r[0], r[1], r[2]) for r in sorted(changed_upstream_data, key=lambda r: r[3])
+    ]
+
+
+def test_propagate_deletes(project: Project):
+    # upstream data to consume
+    upstream_table_name = f"{project.test_schema}.event_data"
+
+    original_upstream_data = [
+        (1, "web", "cglading0@icq.com", to_datetime("2024-01-01 08:57:02")),
+        (2, "web", "dwalczynski1@reuters.com", to_datetime("2024-01-02 22:47:38")),
+        (3, "web", "sleggin2@va.gov", to_datetime("2024-01-03 22:28:34")),
+        (1, "mobile", "atrowsdale3@sun.com", to_datetime("2024-01-04 03:55:21")),
+        (1, "api", "opursey4@drupal.org", to_datetime("2024-01-05 04:39:03")),
+    ]
+
+    new_upstream_data = [
+        # unchanged
+        (1, "web", "cglading0@icq.com", to_datetime("2024-01-01 08:57:02")),
+        # deleted, which should be propagated because it falls within the restatement interval
+        # (2, "web", "dwalczynski1@reuters.com", to_datetime("2024-01-02 22:47:38")),
+        # unchanged
+        (3, "web", "sleggin2@va.gov", to_datetime("2024-01-03 22:28:34")),
+        # deleted, but this is outside the restatement interval so it should still be present
+        # (1, "mobile", "atrowsdale3@sun.com", to_datetime("2024-01-04 03:55:21")),
+        # unchanged
+        (1, "api", "opursey4@drupal.org", to_datetime("2024-01-05 04:39:03")),
+    ]
+
+    upstream_table_columns = {
+        "event_id": exp.DataType.build("int"),
+        "event_source": exp.DataType.build("varchar"),
+        "data": exp.DataType.build("varchar"),
+        "event_timestamp": exp.DataType.build("timestamp"),
+    }
+
+    project.engine_adapter.create_table(
+        upstream_table_name, columns_to_types=upstream_table_columns
+    )
+    project.engine_adapter.insert_append(
+        upstream_table_name,
+        query_or_df=next(
+            d.select_from_values(original_upstream_data, columns_to_types=upstream_table_columns)
+        ),
+    )
+
+    # downstream model using custom materialization
+    project.write_model(
+        "test_table.sql",
+        definition=f"""
+        MODEL (
+            name {project.test_schema}.model,
+            kind CUSTOM (
+                materialization 'non_idempotent_incremental_by_time_range',
+                materialization_properties (
+                    time_column = event_timestamp,
+                    primary_key = (event_id, event_source),
+                    propagate_deletes = true
+                ),
+                batch_size 1,
+                batch_concurrency 1
+            ),
+            start '2024-01-01',
+            end '2024-01-05'
+        );
+
+        SELECT event_id, event_source, data, event_timestamp
+        FROM {upstream_table_name} WHERE event_timestamp BETWEEN @start_dt AND @end_dt;
+    """,
+    )
+
+    ctx = project.context
+    assert len(ctx.models) > 0
+    ctx.plan(auto_apply=True, no_prompts=True)
+
+    assert (
+        project.engine_adapter.fetchone(f"select count(*) from {project.test_schema}.model")[0]  # type: ignore
+        == 5
+    )
+
+    # change upstream data
+    project.engine_adapter.drop_table(upstream_table_name)
+    project.engine_adapter.create_table(
+        upstream_table_name, columns_to_types=upstream_table_columns
+    )
+    project.engine_adapter.insert_append(
+        upstream_table_name,
+        query_or_df=next(
+            d.select_from_values(new_upstream_data, columns_to_types=upstream_table_columns)
+        ),
+    )
+
+    # restate model
+    ctx.plan(
+        restate_models=[f"{project.test_schema}.model"],
+        start=to_datetime("2024-01-01 00:00:00"),
+        end=to_datetime("2024-01-04 00:00:00"),
+        auto_apply=True,
+    )
+
+    # verify new state
+    records = [
+        tuple(r)
+        for r in project.engine_adapter.fetchall(
+            f"select event_id, event_source, data from {project.test_schema}.model order by event_timestamp"
+        )
+    ]
+    assert records == [
+        (1, "web", "cglading0@icq.com"),
+        (3, "web", "sleggin2@va.gov"),
+        (1, "mobile", "atrowsdale3@sun.com"),
+        (1, "api", "opursey4@drupal.org"),
+    ]
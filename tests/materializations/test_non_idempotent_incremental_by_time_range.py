@@ -1,4 +1,5 @@
 import typing as t
+import threading
 import pytest
 from sqlmesh.core.model import Model, load_sql_based_model
 import sqlmesh.core.dialect as d
@@ -8,10 +9,14 @@ from sqlmesh_utils.materializations.non_idempotent_incremental_by_time_range imp
     NonIdempotentIncrementalByTimeRangeKind,
 )
 from tests.materializations.conftest import to_sql_calls, MockedEngineAdapterMaker
+from sqlmesh.core.engine_adapter.base import EngineAdapter
+from sqlmesh.core.engine_adapter.duckdb import DuckDBEngineAdapter
+from sqlmesh.core.engine_adapter.postgres import PostgresEngineAdapter
 from sqlmesh.core.engine_adapter.trino import TrinoEngineAdapter
-from sqlmesh.utils.errors import ConfigError
+from sqlmesh.utils.errors import ConfigError, SQLMeshError
 from sqlmesh.utils.date import to_timestamp, now
 from sqlmesh.core.macros import RuntimeStage
+from pytest_mock import MockerFixture
 
 ModelMaker = t.Callable[..., Model]
 
@@ -53,6 +58,7 @@ def test_kind(make_model: ModelMaker):
 
     assert model.partitioned_by == [exp.to_column("ds", quoted=True)]
     assert model.kind.partition_by_time_column
+    assert not model.kind.propagate_deletes
 
     assert model.kind.time_column.column == exp.to_column("ds", quoted=True)
     assert model.kind.primary_key == [
@@ -170,3 +176,301 @@ def test_partition_by_time_column_opt_out(make_model: ModelMaker):
     assert isinstance(model.kind, NonIdempotentIncrementalByTimeRangeKind)
     assert not model.kind.partition_by_time_column
     assert model.partitioned_by == []
+
+
+def test_merge_buckets(make_model: ModelMaker):
+    model = make_model(["time_column = ds", "primary_key = name"])
+    assert isinstance(model.kind, NonIdempotentIncrementalByTimeRangeKind)
+    assert model.kind.merge_buckets == 1
+    assert model.kind.merge_bucket_concurrency == 1
+
+    model = make_model(
+        [
+            "time_column = ds",
+            "primary_key = name",
+            "merge_buckets = 4",
+            "merge_bucket_concurrency = 2",
+        ]
+    )
+    assert isinstance(model.kind, NonIdempotentIncrementalByTimeRangeKind)
+    assert model.kind.merge_buckets == 4
+    assert model.kind.merge_bucket_concurrency == 2
+
+    with pytest.raises(ConfigError, match=r"`merge_buckets` must be a positive integer"):
+        make_model(["time_column = ds", "primary_key = name", "merge_buckets = 0"])
+
+    with pytest.raises(ConfigError, match=r"`merge_bucket_concurrency` must be a positive integer"):
+        make_model(["time_column = ds", "primary_key = name", "merge_bucket_concurrency = 'a'"])
+
+
+def _bucket_predicate(alias: str, bucket: int, num_buckets: int = 2) -> str:
+    key = ", ".join(f'CAST({alias}"{col}" AS VARCHAR)' for col in ("name", "ds"))
+    return (
+        f"((FROM_BIG_ENDIAN_64(XXHASH64(TO_UTF8(CONCAT_WS('|', {key})))) % {num_buckets} + {num_buckets}) "
+        f"% {num_buckets}) = {bucket}"
+    )
+
+
+def _insert_into_trino(
+    model: Model,
+    make_mocked_engine_adapter: MockedEngineAdapterMaker,
+    mocker: MockerFixture,
+) -> t.List[str]:
+    mocker.patch("sqlmesh.core.engine_adapter.base.random_id", return_value="abcdefgh")
+
+    adapter = make_mocked_engine_adapter(TrinoEngineAdapter)
+    adapter.cursor.fetchone.return_value = ("datalake",)
+    strategy = NonIdempotentIncrementalByTimeRangeMaterialization(adapter)
+
+    start = to_timestamp("2020-01-01")
+    end = to_timestamp("2020-01-03")
+
+    strategy.insert(
+        "test.snapshot_table",
+        query_or_df=model.render_query(
+            start=start, end=end, execution_time=now(), runtime_stage=RuntimeStage.EVALUATING
+        ),
+        model=model,
+        is_first_insert=True,
+        start=start,
+        end=end,
+    )
+
+    sql_calls = to_sql_calls(adapter)
+    assert [c for c in sql_calls if c.startswith("CREATE TABLE")] == [
+        'CREATE TABLE IF NOT EXISTS "datalake"."test"."__temp_snapshot_table_abcdefgh" AS '
+        'SELECT CAST("name" AS VARCHAR) AS "name", CAST("ds" AS TIMESTAMP) AS "ds" FROM ('
+        'SELECT CAST("name" AS VARCHAR) AS "name", CAST("ds" AS TIMESTAMP) AS "ds" '
+        'FROM "upstream"."table" AS "table" '
+        "WHERE \"ds\" BETWEEN '2020-01-01 00:00:00' AND '2020-01-02 23:59:59.999999'"
+        ') AS "_subquery"'
+    ]
+    assert (
+        sql_calls[-1] == 'DROP TABLE IF EXISTS "datalake"."test"."__temp_snapshot_table_abcdefgh"'
+    )
+    return sql_calls
+
+
+def test_insert_merge_buckets(
+    make_model: ModelMaker,
+    make_mocked_engine_adapter: MockedEngineAdapterMaker,
+    mocker: MockerFixture,
+):
+    model: Model = make_model(
+        ["time_column = ds", "primary_key = (name, ds)", "merge_buckets = 2"], dialect="trino"
+    )
+    sql_calls = _insert_into_trino(model, make_mocked_engine_adapter, mocker)
+
+    assert [c for c in sql_calls if c.startswith("MERGE")] == [
+        parse_one(
+            f"""
+            MERGE INTO "test"."snapshot_table" AS "__merge_target__"
+            USING (
+                SELECT "name", "ds"
+                FROM "datalake"."test"."__temp_snapshot_table_abcdefgh"
+                WHERE {_bucket_predicate("", bucket)}
+            ) AS "__MERGE_SOURCE__"
+            ON (
+                "__MERGE_SOURCE__"."ds" BETWEEN CAST('2020-01-01 00:00:00' AS TIMESTAMP) AND CAST('2020-01-02 23:59:59.999999' AS TIMESTAMP)
+                AND "__MERGE_TARGET__"."ds" BETWEEN CAST('2020-01-01 00:00:00' AS TIMESTAMP) AND CAST('2020-01-02 23:59:59.999999' AS TIMESTAMP)
+                AND {_bucket_predicate('"__MERGE_TARGET__".', bucket)}
+            )
+            AND ("__MERGE_TARGET__"."name" = "__MERGE_SOURCE__"."name" AND "__MERGE_TARGET__"."ds" = "__MERGE_SOURCE__"."ds")
+            WHEN MATCHED THEN UPDATE SET "name" = "__MERGE_SOURCE__"."name", "ds" = "__MERGE_SOURCE__"."ds"
+            WHEN NOT MATCHED THEN INSERT ("name", "ds") VALUES ("__MERGE_SOURCE__"."name", "__MERGE_SOURCE__"."ds")
+            """,
+            dialect="trino",
+        ).sql(dialect="trino")
+        for bucket in range(2)
+    ]
+
+
+def test_merge_buckets_postgres(
+    make_model: ModelMaker, make_mocked_engine_adapter: MockedEngineAdapterMaker
+):
+    model: Model = make_model(
+        ["time_column = ds", "primary_key = (name, ds)", "merge_buckets = 4"], dialect="postgres"
+    )
+    adapter = make_mocked_engine_adapter(PostgresEngineAdapter)
+    strategy = NonIdempotentIncrementalByTimeRangeMaterialization(adapter)
+
+    assert (
+        strategy._bucket_predicate(model, 3, alias="__MERGE_TARGET__").sql(dialect="postgres")
+        == '((HASHTEXTEXTENDED(CONCAT_WS(\'|\', "__MERGE_TARGET__"."name", "__MERGE_TARGET__"."ds"), 0) % 4 + 4) % 4) = 3'
+    )
+
+
+def test_merge_buckets_unsupported(
+    make_model: ModelMaker, make_mocked_engine_adapter: MockedEngineAdapterMaker
+):
+    start = to_timestamp("2020-01-01")
+    end = to_timestamp("2020-01-03")
+
+    def _insert(model: Model, adapter: EngineAdapter) -> None:
+        NonIdempotentIncrementalByTimeRangeMaterialization(adapter).insert(
+            "test.snapshot_table",
+            query_or_df=model.render_query(
+                start=start, end=end, execution_time=now(), runtime_stage=RuntimeStage.EVALUATING
+            ),
+            model=model,
+            is_first_insert=True,
+            start=start,
+            end=end,
+        )
+
+    # no hash function for this engine
+    adapter = make_mocked_engine_adapter(DuckDBEngineAdapter)
+    with pytest.raises(
+        SQLMeshError, match=r"`merge_buckets` is not supported on the 'duckdb' engine"
+    ):
+        _insert(
+            make_model(
+                ["time_column = ds", "primary_key = name", "merge_buckets = 2"], dialect="duckdb"
+            ),
+            adapter,
+        )
+    assert to_sql_calls(adapter) == []
+
+    # concurrent buckets can't run inside the evaluator's transaction
+    adapter = make_mocked_engine_adapter(PostgresEngineAdapter, multithreaded=True)
+    with pytest.raises(SQLMeshError, match=r"`merge_bucket_concurrency` is only supported"):
+        _insert(
+            make_model(
+                [
+                    "time_column = ds",
+                    "primary_key = name",
+                    "merge_buckets = 2",
+                    "merge_bucket_concurrency = 2",
+                ],
+                dialect="postgres",
+            ),
+            adapter,
+        )
+    assert to_sql_calls(adapter) == []
+
+    # a single connection can't be shared between threads
+    adapter = make_mocked_engine_adapter(TrinoEngineAdapter)
+    with pytest.raises(SQLMeshError, match=r"`merge_bucket_concurrency` is only supported"):
+        _insert(
+            make_model(
+                [
+                    "time_column = ds",
+                    "primary_key = name",
+                    "merge_buckets = 2",
+                    "merge_bucket_concurrency = 2",
+                ],
+                dialect="trino",
+            ),
+            adapter,
+        )
+    assert to_sql_calls(adapter) == []
+
+
+@pytest.mark.parametrize("merge_buckets", [1, 2])
+def test_insert_propagate_deletes(
+    make_model: ModelMaker,
+    make_mocked_engine_adapter: MockedEngineAdapterMaker,
+    mocker: MockerFixture,
+    merge_buckets: int,
+):
+    model: Model = make_model(
+        [
+            "time_column = ds",
+            "primary_key = (name, ds)",
+            "propagate_deletes = true",
+            f"merge_buckets = {merge_buckets}",
+        ],
+        dialect="trino",
+    )
+    assert isinstance(model.kind, NonIdempotentIncrementalByTimeRangeKind)
+    assert model.kind.propagate_deletes
+
+    sql_calls = _insert_into_trino(model, make_mocked_engine_adapter, mocker)
+
+    def _and_bucket(alias: str, bucket: int) -> str:
+        return f"AND {_bucket_predicate(alias, bucket)}" if merge_buckets > 1 else ""
+
+    expected = []
+    for bucket in range(merge_buckets):
+        expected.extend(
+            [
+                f"""
+                DELETE FROM "test"."snapshot_table"
+                WHERE "snapshot_table"."ds" BETWEEN CAST('2020-01-01 00:00:00' AS TIMESTAMP) AND CAST('2020-01-02 23:59:59.999999' AS TIMESTAMP)
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM "datalake"."test"."__temp_snapshot_table_abcdefgh" AS "__MERGE_SOURCE__"
+                    WHERE "__MERGE_SOURCE__"."ds" BETWEEN CAST('2020-01-01 00:00:00' AS TIMESTAMP) AND CAST('2020-01-02 23:59:59.999999' AS TIMESTAMP)
+                    AND "__MERGE_SOURCE__"."name" = "snapshot_table"."name"
+                    AND "__MERGE_SOURCE__"."ds" = "snapshot_table"."ds"
+                )
+                {_and_bucket('"snapshot_table".', bucket)}
+                """,
+                f"""
+                MERGE INTO "test"."snapshot_table" AS "__merge_target__"
+                USING (
+                    SELECT "name", "ds"
+                    FROM "datalake"."test"."__temp_snapshot_table_abcdefgh"
+                    {"WHERE " + _bucket_predicate("", bucket) if merge_buckets > 1 else ""}
+                ) AS "__MERGE_SOURCE__"
+                ON (
+                    "__MERGE_SOURCE__"."ds" BETWEEN CAST('2020-01-01 00:00:00' AS TIMESTAMP) AND CAST('2020-01-02 23:59:59.999999' AS TIMESTAMP)
+                    AND "__MERGE_TARGET__"."ds" BETWEEN CAST('2020-01-01 00:00:00' AS TIMESTAMP) AND CAST('2020-01-02 23:59:59.999999' AS TIMESTAMP)
+                    {_and_bucket('"__MERGE_TARGET__".', bucket)}
+                )
+                AND ("__MERGE_TARGET__"."name" = "__MERGE_SOURCE__"."name" AND "__MERGE_TARGET__"."ds" = "__MERGE_SOURCE__"."ds")
+                WHEN MATCHED THEN UPDATE SET "name" = "__MERGE_SOURCE__"."name", "ds" = "__MERGE_SOURCE__"."ds"
+                WHEN NOT MATCHED THEN INSERT ("name", "ds") VALUES ("__MERGE_SOURCE__"."name", "__MERGE_SOURCE__"."ds")
+                """,
+            ]
+        )
+
+    assert [c for c in sql_calls if c.startswith(("DELETE", "MERGE"))] == [
+        parse_one(sql, dialect="trino").sql(dialect="trino") for sql in expected
+    ]
+
+
+def test_insert_propagate_deletes_ignores_concurrency_without_buckets(
+    make_model: ModelMaker,
+    make_mocked_engine_adapter: MockedEngineAdapterMaker,
+    mocker: MockerFixture,
+):
+    model: Model = make_model(
+        [
+            "time_column = ds",
+            "primary_key = name",
+            "propagate_deletes = true",
+            "merge_bucket_concurrency = 2",
+        ],
+        dialect="postgres",
+    )
+    adapter = make_mocked_engine_adapter(
+        PostgresEngineAdapter, default_catalog="postgres", multithreaded=True
+    )
+    adapter.connection.server_version = 150000
+    adapter.cursor.fetchone.return_value = ("postgres",)
+
+    threads: t.List[str] = []
+    adapter.cursor.execute.side_effect = lambda *args, **kwargs: threads.append(
+        threading.current_thread().name
+    )
+
+    start = to_timestamp("2020-01-01")
+    end = to_timestamp("2020-01-03")
+
+    NonIdempotentIncrementalByTimeRangeMaterialization(adapter).insert(
+        "test.snapshot_table",
+        query_or_df=model.render_query(
+            start=start, end=end, execution_time=now(), runtime_stage=RuntimeStage.EVALUATING
+        ),
+        model=model,
+        is_first_insert=True,
+        start=start,
+        end=end,
+    )
+
+    # the staged table is only visible within the calling thread's transaction
+    sql_calls = to_sql_calls(adapter)
+    assert any(c.startswith("DELETE") for c in sql_calls)
+    assert any(c.startswith("MERGE") for c in sql_calls)
+    assert threads == [threading.current_thread().name] * len(sql_calls)